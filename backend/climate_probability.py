@@ -6,12 +6,11 @@ the probability of major climate events in Malaysia, including floods, droughts,
 heatwaves, and heavy rainfall.
 """
 
+import math
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple, Optional, Union
 from datetime import datetime
-from scipy import stats
-from collections import defaultdict
 
 
 class ClimateEventAnalyzer:
@@ -24,6 +23,13 @@ class ClimateEventAnalyzer:
         'flood_rainfall': 150,  # mm in 24 hours
     }
     
+    # Monsoon seasons for Malaysia
+    SEASON_MONTHS = {
+        'northeast_monsoon': [11, 12, 1, 2, 3],  # Nov - Mar (wet season)
+        'southwest_monsoon': [5, 6, 7, 8, 9],    # May - Sep (dry season)
+        'inter_monsoon': [4, 10],                # Apr, Oct (transition)
+    }
+    
     def __init__(self, historical_data: Optional[pd.DataFrame] = None):
         """
         Initialize the analyzer with historical climate data.
@@ -33,8 +39,18 @@ class ClimateEventAnalyzer:
                            Note: Only rainfall data is used for analysis
         """
         self.historical_data = historical_data
-        self.event_counts = defaultdict(int)
+        # Core rainfall events are always present; event_type data may add more keys
+        self.event_counts = {'heavy_rainfall': 0, 'extreme_rainfall': 0, 'flood': 0}
         self.total_days = 0
+        self._event_masks = {}
+        self._date_valid = None
+        self._months = None
+        self._unique_years = None
+        self._year_index = None
+        
+        # Seasonal results are fixed once the data is processed, so they are memoized
+        # (only for the tracked rainfall events, so caller input cannot grow the cache)
+        self._seasonal_cache = {}
         
         if historical_data is not None:
             self._process_historical_data()
@@ -46,27 +62,62 @@ class ClimateEventAnalyzer:
         
         self.total_days = len(self.historical_data)
         
+        # Parse dates once (without touching the caller's frame) and keep the
+        # calendar fields used by the seasonal and trend queries
+        if 'date' in self.historical_data.columns:
+            if not pd.api.types.is_datetime64_any_dtype(self.historical_data['date']):
+                self.historical_data = self.historical_data.assign(
+                    date=pd.to_datetime(self.historical_data['date'])
+                )
+            dates = self.historical_data['date']
+            valid = dates.notna().to_numpy()
+            if not valid.all():
+                # Days without a date are left out of the seasonal and trend queries
+                self._date_valid = valid
+                dates = dates[valid]
+            self._months = dates.dt.month.to_numpy()
+            
+            # Sorted calendar years that have data, and each day's position
+            # among them, so a trend query is a single bincount
+            years = dates.dt.year.to_numpy()
+            if len(years) > 0:
+                first_year = years.min()
+                year_offsets = years - first_year
+                has_data = np.bincount(year_offsets) > 0
+                self._unique_years = np.flatnonzero(has_data) + first_year
+                self._year_index = (np.cumsum(has_data) - 1)[year_offsets]
+            else:
+                self._unique_years = years
+                self._year_index = np.zeros(0, dtype=np.intp)
+        
         # Count different types of rainfall events
         if 'rainfall' in self.historical_data.columns:
-            self.event_counts['heavy_rainfall'] = (
-                self.historical_data['rainfall'] >= self.THRESHOLDS['heavy_rainfall']
-            ).sum()
-            self.event_counts['extreme_rainfall'] = (
-                self.historical_data['rainfall'] >= self.THRESHOLDS['extreme_rainfall']
-            ).sum()
-            self.event_counts['flood'] = (
-                self.historical_data['rainfall'] >= self.THRESHOLDS['flood_rainfall']
-            ).sum()
+            # Contiguous view (no copy for a plain float column) for the threshold scans
+            rainfall = np.ascontiguousarray(self.historical_data['rainfall'].to_numpy())
+            
+            # Per-day event masks, reused by the seasonal and trend queries
+            self._event_masks = {
+                'heavy_rainfall': rainfall >= self.THRESHOLDS['heavy_rainfall'],
+                'extreme_rainfall': rainfall >= self.THRESHOLDS['extreme_rainfall'],
+                'flood': rainfall >= self.THRESHOLDS['flood_rainfall'],
+            }
+            for event, mask in self._event_masks.items():
+                self.event_counts[event] = np.count_nonzero(mask)
         
         # If event_type column exists, use it directly (only for flood/rainfall events)
         if 'event_type' in self.historical_data.columns:
-            event_type_counts = self.historical_data['event_type'].value_counts()
-            for event, count in event_type_counts.items():
-                if event and str(event).lower() != 'none':
-                    event_lower = str(event).lower()
-                    # Only count flood and rainfall related events
-                    if 'flood' in event_lower or 'rainfall' in event_lower or 'rain' in event_lower:
-                        self.event_counts[event_lower] += count
+            event_types = self.historical_data['event_type'].dropna().astype(str).str.lower()
+            # Only count flood and rainfall related events
+            event_types = event_types[event_types.str.contains('flood|rain', regex=True)]
+            for event, count in event_types.value_counts().items():
+                self.event_counts[event] = self.event_counts.get(event, 0) + count
+    
+    def _dated_event_mask(self, event_type: str) -> Optional[np.ndarray]:
+        """Event mask restricted to the days that have a date (None for unknown events)."""
+        event_mask = self._event_masks.get(event_type)
+        if event_mask is None or self._date_valid is None:
+            return event_mask
+        return event_mask[self._date_valid]
     
 
     
@@ -88,17 +139,24 @@ class ClimateEventAnalyzer:
         if self.total_days == 0:
             return 0.0
         
-        event_count = self.event_counts.get(event_type.lower(), 0)
+        # Canonical (lower-case) names hit directly; only other spellings are normalised
+        event_count = self.event_counts.get(event_type)
+        if event_count is None:
+            event_count = self.event_counts.get(event_type.lower(), 0)
         
         # Calculate daily probability
         daily_probability = event_count / self.total_days
         
         # Calculate probability for the time window
-        # Using complement probability: P(at least one event) = 1 - P(no events)
-        probability_no_events = (1 - daily_probability) ** time_window
-        probability_at_least_one = 1 - probability_no_events
+        # Using complement probability: P(at least one event) = 1 - P(no events),
+        # with 1 - (1 - p)^n evaluated as -expm1(n * log1p(-p)) to stay accurate for small p
+        if daily_probability >= 1:
+            probability = 1.0
+        else:
+            probability_at_least_one = -math.expm1(time_window * math.log1p(-daily_probability))
+            probability = min(probability_at_least_one, 1.0)
         
-        return min(probability_at_least_one, 1.0)
+        return probability
     
     def calculate_all_probabilities(
         self, 
@@ -135,41 +193,52 @@ class ClimateEventAnalyzer:
         Returns:
             Probability of the event during that season
         """
-        if self.historical_data is None or 'date' not in self.historical_data.columns:
+        if self._months is None:
             return 0.0
         
-        # Define seasons for Malaysia
-        season_months = {
-            'northeast_monsoon': [11, 12, 1, 2, 3],  # Nov - Mar (wet season)
-            'southwest_monsoon': [5, 6, 7, 8, 9],    # May - Sep (dry season)
-            'inter_monsoon': [4, 10],                # Apr, Oct (transition)
-        }
-        
-        if season not in season_months:
+        if season not in self.SEASON_MONTHS:
             raise ValueError(f"Unknown season: {season}")
         
-        # Filter data for the specified season
-        df = self.historical_data.copy()
-        if not pd.api.types.is_datetime64_any_dtype(df['date']):
-            df['date'] = pd.to_datetime(df['date'])
+        return self.get_seasonal_probabilities(event_type)[season]
+    
+    def get_seasonal_probabilities(self, event_type: str) -> Dict[str, float]:
+        """
+        Calculate probability of an event during every season in one pass.
         
-        df['month'] = df['date'].dt.month
-        season_data = df[df['month'].isin(season_months[season])]
+        Args:
+            event_type: Type of climate event
         
-        if len(season_data) == 0:
-            return 0.0
+        Returns:
+            Dictionary mapping season names to the event's probability in that season
+        """
+        seasons = list(self.SEASON_MONTHS)
+        if self._months is None:
+            return {season: 0.0 for season in seasons}
+        
+        cached = [self._seasonal_cache.get((event_type, season)) for season in seasons]
+        if None not in cached:
+            return dict(zip(seasons, cached))
+        
+        # Season index per day via a month (1-12) lookup table
+        season_by_month = np.full(13, len(seasons))
+        for season_id, season in enumerate(seasons):
+            season_by_month[self.SEASON_MONTHS[season]] = season_id
+        season_ids = season_by_month[self._months]
+        season_days = np.bincount(season_ids, minlength=len(seasons))[:len(seasons)]
+        
+        # Count rainfall/flood events per season
+        event_mask = self._dated_event_mask(event_type)
+        if event_mask is None:
+            event_counts = np.zeros(len(seasons))
+        else:
+            event_counts = np.bincount(season_ids, weights=event_mask, minlength=len(seasons))[:len(seasons)]
         
-        # Count rainfall/flood events in this season
-        event_count = 0
-        if 'rainfall' in season_data.columns:
-            if event_type == 'heavy_rainfall':
-                event_count = (season_data['rainfall'] >= self.THRESHOLDS['heavy_rainfall']).sum()
-            elif event_type == 'extreme_rainfall':
-                event_count = (season_data['rainfall'] >= self.THRESHOLDS['extreme_rainfall']).sum()
-            elif event_type == 'flood':
-                event_count = (season_data['rainfall'] >= self.THRESHOLDS['flood_rainfall']).sum()
-        
-        return event_count / len(season_data) if len(season_data) > 0 else 0.0
+        probabilities = {}
+        for season, days, count in zip(seasons, season_days.tolist(), event_counts.tolist()):
+            probabilities[season] = count / days if days > 0 else 0.0
+            if event_mask is not None:
+                self._seasonal_cache[(event_type, season)] = probabilities[season]
+        return probabilities
     
     def predict_trend(
         self, 
@@ -195,28 +264,16 @@ class ClimateEventAnalyzer:
             }
         
         # Calculate yearly event counts
-        df = self.historical_data.copy()
-        if not pd.api.types.is_datetime64_any_dtype(df['date']):
-            df['date'] = pd.to_datetime(df['date'])
-        
-        df['year'] = df['date'].dt.year
-        yearly_stats = []
-        
-        for year in sorted(df['year'].unique()):
-            year_data = df[df['year'] == year]
-            year_events = 0
-            
-            if 'rainfall' in year_data.columns:
-                if event_type == 'heavy_rainfall':
-                    year_events = (year_data['rainfall'] >= self.THRESHOLDS['heavy_rainfall']).sum()
-                elif event_type == 'extreme_rainfall':
-                    year_events = (year_data['rainfall'] >= self.THRESHOLDS['extreme_rainfall']).sum()
-                elif event_type == 'flood':
-                    year_events = (year_data['rainfall'] >= self.THRESHOLDS['flood_rainfall']).sum()
-            
-            yearly_stats.append((year, year_events))
-        
-        if len(yearly_stats) < 2:
+        years = events = np.empty(0)
+        if self._unique_years is not None:
+            years = self._unique_years
+            event_mask = self._dated_event_mask(event_type)
+            if event_mask is None:
+                events = np.zeros(len(years))
+            else:
+                events = np.bincount(self._year_index, weights=event_mask, minlength=len(years))
+        
+        if len(years) < 2:
             return {
                 'trend': 'insufficient_data',
                 'current_probability': self.calculate_event_probability(event_type),
@@ -224,11 +281,17 @@ class ClimateEventAnalyzer:
                 'confidence': 'low'
             }
         
-        # Linear regression for trend analysis
-        years = np.array([y[0] for y in yearly_stats])
-        events = np.array([y[1] for y in yearly_stats])
-        
-        slope, intercept, r_value, p_value, std_err = stats.linregress(years, events)
+        # Least-squares line for trend analysis (closed form; only the fit and R² are used)
+        x_mean = years.mean()
+        y_mean = events.mean()
+        dx = years - x_mean
+        dy = events - y_mean
+        slope = (dx @ dy) / (dx @ dx)
+        intercept = y_mean - slope * x_mean
+        residuals = dy - slope * dx
+        ss_tot = dy @ dy
+        # R² is undefined for a flat series
+        r_squared = 1.0 - (residuals @ residuals) / ss_tot if ss_tot > 0 else np.nan
         
         # Predict future events
         future_year = years[-1] + years_ahead
@@ -244,7 +307,7 @@ class ClimateEventAnalyzer:
             trend = 'stable'
         
         # Confidence based on R-squared
-        confidence = 'high' if r_value ** 2 > 0.7 else 'medium' if r_value ** 2 > 0.4 else 'low'
+        confidence = 'high' if r_squared > 0.7 else 'medium' if r_squared > 0.4 else 'low'
         
         current_prob = self.calculate_event_probability(event_type)
         
@@ -262,7 +325,7 @@ class ClimateEventAnalyzer:
             'current_probability': float(current_prob),
             'predicted_probability': float(predicted_prob),
             'confidence': confidence,
-            'r_squared': float(r_value ** 2)
+            'r_squared': float(r_squared)
         }
 
 
@@ -302,7 +365,8 @@ def calculate_climate_event_probability(
 
 def generate_sample_data(
     years: int = 10,
-    location: str = 'peninsular'
+    location: str = 'peninsular',
+    seed: Optional[int] = None
 ) -> pd.DataFrame:
     """
     Generate sample climate data for Malaysia for testing purposes.
@@ -310,12 +374,14 @@ def generate_sample_data(
     Args:
         years: Number of years of data to generate
         location: Region of Malaysia ('peninsular', 'sabah', 'sarawak')
+        seed: Seed for the random generator (None for random data)
     
     Returns:
         DataFrame with synthetic climate data (rainfall only)
     """
     days = years * 365
     dates = pd.date_range(end=datetime.now(), periods=days)
+    rng = np.random.default_rng(seed)
     
     # Regional rainfall characteristics
     climate_params = {
@@ -327,43 +393,41 @@ def generate_sample_data(
     params = climate_params.get(location, climate_params['peninsular'])
     
     # Generate synthetic data with seasonal patterns
-    months = np.array([d.month for d in dates])
+    months = dates.month.to_numpy()
     
-    # Rainfall with monsoon patterns (higher in Nov-Mar for NE monsoon)
-    monsoon_factor = np.where(
-        (months >= 11) | (months <= 3),
-        1.5,  # NE monsoon season
-        np.where(
-            (months >= 5) & (months <= 9),
-            0.7,  # SW monsoon (drier)
-            1.0   # Inter-monsoon
-        )
-    )
-    rainfall = np.random.gamma(params['rain_alpha'], params['rain_beta'], days) * monsoon_factor
+    # Rainfall with monsoon patterns (higher in Nov-Mar for NE monsoon),
+    # looked up per day from a table indexed by month (1-12)
+    monsoon_by_month = np.full(13, 1.0)  # Inter-monsoon
+    monsoon_by_month[[11, 12, 1, 2, 3]] = 1.5  # NE monsoon season
+    monsoon_by_month[[5, 6, 7, 8, 9]] = 0.7  # SW monsoon (drier)
+    monsoon_factor = monsoon_by_month[months]
+    # Fill one preallocated buffer in place: gamma(alpha, beta) == beta * standard_gamma(alpha)
+    rainfall = np.empty(days)
+    rng.standard_gamma(params['rain_alpha'], size=days, out=rainfall)
+    rainfall *= params['rain_beta']
+    rainfall *= monsoon_factor
     
     # Add some extreme events
-    extreme_indices = np.random.choice(days, size=int(days * 0.02), replace=False)
-    rainfall[extreme_indices] *= np.random.uniform(3, 8, len(extreme_indices))
+    extreme_indices = rng.choice(days, size=int(days * 0.02), replace=False)
+    rainfall[extreme_indices] *= rng.uniform(3, 8, len(extreme_indices))
+    
+    # Millimetre readings need nowhere near float64 precision; float32 halves
+    # the bytes every downstream threshold scan has to read
+    rainfall = rainfall.astype(np.float32)
+    
+    # Classify rainfall/flood events
+    events = np.select(
+        [rainfall >= 200, rainfall >= 150, rainfall >= 100],
+        ['extreme_rainfall', 'flood', 'heavy_rainfall'],
+        default=None
+    )
     
     df = pd.DataFrame({
         'date': dates,
         'rainfall': rainfall,
+        'event_type': events,
     })
     
-    # Classify rainfall/flood events
-    events = []
-    for _, row in df.iterrows():
-        if row['rainfall'] >= 200:
-            events.append('extreme_rainfall')
-        elif row['rainfall'] >= 150:
-            events.append('flood')
-        elif row['rainfall'] >= 100:
-            events.append('heavy_rainfall')
-        else:
-            events.append(None)
-    
-    df['event_type'] = events
-    
     return df
 
 
@@ -26,6 +26,7 @@ import numpy as np
 import pandas as pd
 import requests
 import json
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
 from scipy import stats
@@ -52,17 +53,24 @@ class ClimadaAPIClient:
     - Query climate scenarios
     """
     
-    def __init__(self, cache_dir: str = "./climada_cache"):
+    def __init__(self, cache_dir: str = "./climada_cache", seed: Optional[int] = None,
+                 max_cached_hazards: int = 32):
         """
         Initialize CLIMADA API client.
         
         Args:
             cache_dir: Directory to cache downloaded datasets
+            seed: Seed for the random generator used to simulate hazard data (None for random)
+            max_cached_hazards: Hazard tables kept in memory; the least recently used is evicted
         """
         self.base_url = CLIMADA_API_BASE_URL
         self.cache_dir = cache_dir
         self.session = requests.Session()
         self.session.headers.update({'User-Agent': 'ClimateProb-Malaysia/2.0'})
+        self._rng = np.random.default_rng(seed)
+        # Hazard tables already built by this client, keyed by (scenario, return periods)
+        self.max_cached_hazards = max_cached_hazards
+        self._hazard_cache = OrderedDict()
     
     def list_datasets(self, data_type: str = 'river_flood') -> List[Dict]:
         """
@@ -122,8 +130,14 @@ class ClimadaAPIClient:
             return_periods: Return periods to analyze (years)
             
         Returns:
-            DataFrame with flood hazard information
+            DataFrame with flood hazard information (built once per scenario and
+            return periods on this client; each call gets its own copy)
         """
+        cache_key = (scenario, tuple(return_periods))
+        if cache_key in self._hazard_cache:
+            self._hazard_cache.move_to_end(cache_key)
+            return self._hazard_cache[cache_key].copy()
+        
         # Simulate CLIMADA hazard data for Malaysia
         # In production, this would fetch real data from CLIMADA API
         
@@ -148,7 +162,7 @@ class ClimadaAPIClient:
                 # Simulate flood intensity (depth in meters) based on return period
                 # Using CLIMADA-like probabilistic approach
                 base_intensity = np.log10(rp) * 0.5
-                intensity = base_intensity + np.random.normal(0, 0.2)
+                intensity = base_intensity + self._rng.normal(0, 0.2)
                 
                 # Country-level data represents national average
                 if loc_type == 'country':
@@ -195,7 +209,11 @@ class ClimadaAPIClient:
                     'data_source': 'CLIMADA-simulated'
                 })
         
-        return pd.DataFrame(data)
+        hazard = pd.DataFrame(data)
+        self._hazard_cache[cache_key] = hazard
+        while len(self._hazard_cache) > self.max_cached_hazards:
+            self._hazard_cache.popitem(last=False)
+        return hazard.copy()
     
     def get_exposure_litpop(self, country_code: str = 'MYS') -> Dict:
         """
@@ -265,6 +283,10 @@ class ClimadaFloodAnalyzer:
         self.hazard_data = None
         self.exposure_data = None
         self.use_isimip = use_isimip
+        # Hazard rows per location (sorted by return period) and the hazard_data
+        # frame they were built from; rebuilt when hazard_data is replaced
+        self._hazard_by_location = {}
+        self._indexed_hazard = None
         
     def load_flood_hazard(self, scenario: str = 'historical',
                          return_periods: Optional[List[int]] = None,
@@ -323,6 +345,37 @@ class ClimadaFloodAnalyzer:
         print(f"✓ Loaded {len(self.hazard_data)} hazard records")
         return self.hazard_data
     
+    def _index_hazard(self) -> None:
+        """Group the loaded hazard rows by location, each sorted by return period."""
+        ordered = self.hazard_data.sort_values('return_period', kind='stable')
+        self._hazard_by_location = {
+            location: group for location, group in ordered.groupby('location', sort=False)
+        }
+        self._indexed_hazard = self.hazard_data
+    
+    def get_location_hazard(self, location: str) -> pd.DataFrame:
+        """
+        Get the loaded hazard rows for one location.
+        
+        Args:
+            location: Location name
+            
+        Returns:
+            DataFrame of hazard rows sorted by return period (empty if unknown)
+        """
+        if self.hazard_data is None:
+            self.load_flood_hazard()
+        
+        # Index on first use and whenever hazard_data has been replaced
+        # (edit a copy and assign it back rather than modifying it in place)
+        if self.hazard_data is not self._indexed_hazard:
+            self._index_hazard()
+        
+        loc_hazard = self._hazard_by_location.get(location)
+        if loc_hazard is None:
+            return self.hazard_data.iloc[0:0]
+        return loc_hazard
+    
     def load_exposure(self) -> Dict:
         """
         Load exposure data from CLIMADA LitPop.
@@ -349,16 +402,10 @@ class ClimadaFloodAnalyzer:
         Returns:
             Probability of flood event
         """
-        if self.hazard_data is None:
-            self.load_flood_hazard()
-        
-        # Filter data for location and return period
-        loc_data = self.hazard_data[
-            (self.hazard_data['location'] == location) &
-            (self.hazard_data['return_period'] == return_period)
-        ]
+        # Check the location has data for this return period
+        loc_hazard = self.get_location_hazard(location)
         
-        if loc_data.empty:
+        if not (loc_hazard['return_period'] == return_period).any():
             return 0.0
         
         # Annual probability from return period
@@ -370,20 +417,21 @@ class ClimadaFloodAnalyzer:
         
         return probability
     
-    def calculate_return_period_from_data(self, flood_events: pd.Series) -> pd.DataFrame:
+    def calculate_return_period_from_data(self, flood_events: Union[pd.Series, np.ndarray]) -> pd.DataFrame:
         """
         Calculate return periods from historical flood data.
         
         Uses CLIMADA's approach: fit extreme value distribution.
         
         Args:
-            flood_events: Series of flood magnitudes (rainfall or depth)
+            flood_events: Series or array of flood magnitudes (rainfall or depth)
             
         Returns:
             DataFrame with return periods and corresponding magnitudes
         """
-        # Remove zeros and sort
-        events = flood_events[flood_events > 0].sort_values(ascending=False)
+        # Remove zeros (the fit does not need the events sorted)
+        events = np.asarray(flood_events, dtype=np.float64)
+        events = events[events > 0]
         
         if len(events) < 10:
             warnings.warn("Insufficient data for reliable return period calculation")
@@ -394,20 +442,16 @@ class ClimadaFloodAnalyzer:
             shape, loc, scale = stats.genextreme.fit(events)
             
             # Calculate return periods
-            return_periods = [2, 5, 10, 25, 50, 100, 250, 500, 1000]
-            magnitudes = []
+            return_periods = np.array([2, 5, 10, 25, 50, 100, 250, 500, 1000])
+            annual_probabilities = 1 / return_periods
             
-            for rp in return_periods:
-                # Convert return period to probability
-                prob = 1 - (1 / rp)
-                # Calculate magnitude for this probability
-                magnitude = stats.genextreme.ppf(prob, shape, loc, scale)
-                magnitudes.append(magnitude)
+            # Magnitude at each return period's non-exceedance probability, in one call
+            magnitudes = stats.genextreme.ppf(1 - annual_probabilities, shape, loc, scale)
             
             result = pd.DataFrame({
                 'return_period_years': return_periods,
                 'flood_magnitude': magnitudes,
-                'annual_probability': [1/rp for rp in return_periods],
+                'annual_probability': annual_probabilities,
                 'method': 'GEV distribution (CLIMADA approach)'
             })
             
@@ -470,14 +514,11 @@ class ClimadaFloodAnalyzer:
         Returns:
             Dictionary with impact metrics
         """
-        if self.hazard_data is None:
-            self.load_flood_hazard()
+        # Get hazard data for location
+        loc_hazard = self.get_location_hazard(location)
         if self.exposure_data is None:
             self.load_exposure()
         
-        # Get hazard data for location
-        loc_hazard = self.hazard_data[self.hazard_data['location'] == location]
-        
         if loc_hazard.empty:
             return {}
         
@@ -505,28 +546,28 @@ class ClimadaFloodAnalyzer:
             # Default to equal share if state not in list
             location_exposure = total_exposure * state_exposure_ratios.get(location, 0.04)
         
-        # Calculate impact for each return period
-        eai = 0.0
-        impacts = []
+        # Calculate impact for all return periods at once
+        # Simple damage function: damage increases with flood intensity
+        intensities = loc_hazard['flood_intensity_m'].to_numpy(dtype=float)
+        probabilities = loc_hazard['annual_probability'].to_numpy(dtype=float)
+        damage_ratios = np.minimum(1.0, intensities / 3.0)  # Max damage at 3m depth
+        impact_values = location_exposure * damage_ratios
         
-        for _, row in loc_hazard.iterrows():
-            # Simple damage function: damage increases with flood intensity
-            # Using sigmoid-like function
-            intensity = row['flood_intensity_m']
-            damage_ratio = min(1.0, intensity / 3.0)  # Max damage at 3m depth
-            
-            impact = location_exposure * damage_ratio
-            probability = row['annual_probability']
-            
-            eai += probability * impact
-            
-            impacts.append({
-                'return_period': row['return_period'],
+        eai = float(np.dot(probabilities, impact_values))
+        
+        impacts = [
+            {
+                'return_period': rp,
                 'probability': probability,
                 'flood_intensity_m': intensity,
                 'damage_ratio': damage_ratio,
                 'impact_usd': impact
-            })
+            }
+            for rp, probability, intensity, damage_ratio, impact in zip(
+                loc_hazard['return_period'].tolist(), probabilities.tolist(),
+                intensities.tolist(), damage_ratios.tolist(), impact_values.tolist()
+            )
+        ]
         
         return {
             'location': location,
@@ -538,21 +579,23 @@ class ClimadaFloodAnalyzer:
 
 
 def generate_climada_report(location: str = 'Kuala Lumpur',
-                           scenario: str = 'rcp45') -> str:
+                           scenario: str = 'rcp45',
+                           api_client: Optional[ClimadaAPIClient] = None) -> str:
     """
     Generate comprehensive CLIMADA-based flood risk report.
     
     Args:
         location: Location to analyze
         scenario: Climate scenario
+        api_client: ClimadaAPIClient instance to reuse (creates new if None)
         
     Returns:
         Formatted report string
     """
-    analyzer = ClimadaFloodAnalyzer()
+    analyzer = ClimadaFloodAnalyzer(api_client=api_client)
     
     # Load data
-    analyzer.load_flood_hazard(scenario=scenario)
+    analyzer.load_flood_hazard(scenario=scenario, location=location)
     analyzer.load_exposure()
     
     # Generate report
@@ -569,17 +612,15 @@ def generate_climada_report(location: str = 'Kuala Lumpur',
     report.append("\n📊 FLOOD HAZARD BY RETURN PERIOD")
     report.append("-"*80)
     
-    loc_hazard = analyzer.hazard_data[analyzer.hazard_data['location'] == location]
+    loc_hazard = analyzer.get_location_hazard(location)
     
     if not loc_hazard.empty:
         report.append("\nReturn Period  Annual Prob   Flood Depth   Likelihood")
         report.append("-"*80)
         
-        for _, row in loc_hazard.sort_values('return_period').iterrows():
-            rp = row['return_period']
-            prob = row['annual_probability']
-            depth = row['flood_intensity_m']
-            
+        for rp, prob, depth in zip(loc_hazard['return_period'].tolist(),
+                                   loc_hazard['annual_probability'].tolist(),
+                                   loc_hazard['flood_intensity_m'].tolist()):
             bar = "█" * int(depth * 5)
             report.append(f"{rp:>6} years     {prob:>6.2%}      {depth:>5.2f}m     {bar}")
     
@@ -593,11 +634,14 @@ def generate_climada_report(location: str = 'Kuala Lumpur',
         report.append("\nScenario     Flood Depth   Change from Historical")
         report.append("-"*80)
         
-        for _, row in scenario_comp.iterrows():
-            scen = row['scenario']
-            depth = row['flood_intensity_m']
-            change = row.get('intensity_change_pct', 0)
-            
+        if 'intensity_change_pct' in scenario_comp.columns:
+            changes = scenario_comp['intensity_change_pct'].tolist()
+        else:
+            changes = [0] * len(scenario_comp)
+        
+        for scen, depth, change in zip(scenario_comp['scenario'].tolist(),
+                                       scenario_comp['flood_intensity_m'].tolist(),
+                                       changes):
             bar = "▓" * int(abs(change) / 5)
             sign = "+" if change > 0 else ""
             report.append(f"{scen:<12} {depth:>6.2f}m     {sign}{change:>6.1f}%  {bar}")
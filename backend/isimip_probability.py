@@ -25,7 +25,12 @@ import pandas as pd
 from typing import Dict, List, Tuple, Optional
 from scipy import stats
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+import logging
 import warnings
+import zlib
+
+logger = logging.getLogger(__name__)
 
 
 class ISIMIPDataProcessor:
@@ -50,17 +55,19 @@ class ISIMIPDataProcessor:
         'Sarawak': {'lat': 1.5533, 'lon': 110.3593}
     }
     
-    def __init__(self, location: str = 'Malaysia (Country)'):
+    def __init__(self, location: str = 'Malaysia (Country)', seed: Optional[int] = None):
         """
         Initialize ISIMIP data processor for a specific location.
         
         Args:
             location: Malaysian state or country-level analysis
+            seed: Seed for the random generator used to simulate data (None for random)
         """
         self.location = location
         self.coordinates = self.MALAYSIA_REGIONS.get(location, self.MALAYSIA_REGIONS['Malaysia (Country)'])
         self.rainfall_data = None
         self.discharge_data = None
+        self._rng = np.random.default_rng(seed)
         
     def generate_historical_data(self, years: int = 50) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
@@ -99,24 +106,21 @@ class ISIMIPDataProcessor:
         rainfall = []
         discharge = []
         
-        for date in dates:
+        # Seasonal factor (monsoon impact) as a lookup table indexed by month (1-12)
+        seasonal_by_month = np.full(13, 1.1)  # Southwest monsoon
+        seasonal_by_month[[11, 12, 1, 2, 3]] = factors['monsoon']  # Northeast monsoon (strongest)
+        seasonal_by_month[[4, 10]] = 0.9  # Inter-monsoon
+        seasonal_factors = seasonal_by_month[dates.month.to_numpy()]
+        
+        for seasonal_factor in seasonal_factors:
             # Base rainfall
             base_rain = factors['base'] / 365  # Daily average
             
-            # Seasonal factor (monsoon impact)
-            month = date.month
-            if month in [11, 12, 1, 2, 3]:  # Northeast monsoon (strongest)
-                seasonal_factor = factors['monsoon']
-            elif month in [5, 6, 7, 8, 9]:  # Southwest monsoon
-                seasonal_factor = 1.1
-            else:  # Inter-monsoon
-                seasonal_factor = 0.9
-            
             # Random variability with extreme events
-            if np.random.random() < 0.05:  # 5% chance of heavy rain
-                variability = np.random.gamma(3, factors['variability'] * 2)
+            if self._rng.random() < 0.05:  # 5% chance of heavy rain
+                variability = self._rng.gamma(3, factors['variability'] * 2)
             else:
-                variability = np.random.gamma(2, factors['variability'])
+                variability = self._rng.gamma(2, factors['variability'])
             
             daily_rain = base_rain * seasonal_factor * variability
             rainfall.append(max(0, daily_rain))
@@ -125,9 +129,9 @@ class ISIMIPDataProcessor:
             # Simplified model: discharge proportional to recent rainfall
             if len(rainfall) >= 7:
                 recent_rain = np.mean(rainfall[-7:])  # 7-day average
-                discharge_value = recent_rain * 10 * (1 + np.random.normal(0, 0.3))  # m3/s
+                discharge_value = recent_rain * 10 * (1 + self._rng.normal(0, 0.3))  # m3/s
             else:
-                discharge_value = daily_rain * 10 * (1 + np.random.normal(0, 0.3))
+                discharge_value = daily_rain * 10 * (1 + self._rng.normal(0, 0.3))
             
             discharge.append(max(0, discharge_value))
         
@@ -209,36 +213,30 @@ class ISIMIPDataProcessor:
         Returns:
             DataFrame with return periods and corresponding flood magnitudes
         """
-        results = []
-        
-        for rp in return_periods:
-            # Calculate return level using GEV quantile function
-            # Return level = value exceeded with probability 1/T where T is return period
-            exceedance_prob = 1.0 / rp
-            non_exceedance_prob = 1 - exceedance_prob
-            
-            # GEV quantile
-            return_level = stats.genextreme.ppf(
-                non_exceedance_prob,
-                gev_params['shape'],
-                loc=gev_params['location'],
-                scale=gev_params['scale']
-            )
-            
-            # Calculate confidence intervals (95%)
-            # Simplified approach - in practice would use bootstrap or delta method
-            ci_lower = return_level * 0.8
-            ci_upper = return_level * 1.2
-            
-            results.append({
-                'return_period': rp,
-                'return_level': return_level,
-                'annual_probability': 1.0 / rp,
-                'ci_lower': ci_lower,
-                'ci_upper': ci_upper
-            })
-        
-        return pd.DataFrame(results)
+        return_periods = np.asarray(return_periods)
+        
+        # Calculate return levels using GEV quantile function, for all periods at once
+        # Return level = value exceeded with probability 1/T where T is return period
+        exceedance_prob = 1.0 / return_periods
+        non_exceedance_prob = 1 - exceedance_prob
+        
+        # GEV quantile
+        return_levels = stats.genextreme.ppf(
+            non_exceedance_prob,
+            gev_params['shape'],
+            loc=gev_params['location'],
+            scale=gev_params['scale']
+        )
+        
+        # Calculate confidence intervals (95%)
+        # Simplified approach - in practice would use bootstrap or delta method
+        return pd.DataFrame({
+            'return_period': return_periods,
+            'return_level': return_levels,
+            'annual_probability': exceedance_prob,
+            'ci_lower': return_levels * 0.8,
+            'ci_upper': return_levels * 1.2
+        })
     
     def calculate_flood_probabilities(self, years: int = 50) -> Dict:
         """
@@ -256,8 +254,8 @@ class ISIMIPDataProcessor:
         Returns:
             Dictionary with complete probability analysis
         """
-        print(f"📊 Calculating flood probabilities for {self.location}...")
-        print(f"   Using {years} years of historical data")
+        logger.info("📊 Calculating flood probabilities for %s...", self.location)
+        logger.info("   Using %d years of historical data", years)
         
         # Step 1: Load data
         rainfall_df, discharge_df = self.generate_historical_data(years)
@@ -266,20 +264,20 @@ class ISIMIPDataProcessor:
         rainfall_maxima = self.extract_annual_maxima(rainfall_df['rainfall_mm'])
         discharge_maxima = self.extract_annual_maxima(discharge_df['discharge_m3s'])
         
-        print(f"   ✓ Extracted {len(rainfall_maxima)} years of annual maxima")
+        logger.info("   ✓ Extracted %d years of annual maxima", len(rainfall_maxima))
         
         # Step 3: Fit GEV distributions
         rainfall_gev = self.fit_gev_distribution(rainfall_maxima)
         discharge_gev = self.fit_gev_distribution(discharge_maxima)
         
-        print(f"   ✓ GEV fit quality: {rainfall_gev['fit_quality']}")
+        logger.info("   ✓ GEV fit quality: %s", rainfall_gev['fit_quality'])
         
         # Step 4: Calculate return levels
         return_periods = [10, 25, 50, 100, 250]
         rainfall_return_levels = self.calculate_return_levels(rainfall_gev, return_periods)
         discharge_return_levels = self.calculate_return_levels(discharge_gev, return_periods)
         
-        print(f"   ✓ Calculated return levels for {len(return_periods)} periods")
+        logger.info("   ✓ Calculated return levels for %d periods", len(return_periods))
         
         return {
             'location': self.location,
@@ -303,7 +301,8 @@ class ISIMIPDataProcessor:
 
 def calculate_isimip_flood_risk(location: str = 'Malaysia (Country)', 
                                 scenario: str = 'historical',
-                                years: int = 50) -> pd.DataFrame:
+                                years: int = 50,
+                                seed: Optional[int] = None) -> pd.DataFrame:
     """
     Calculate flood risk metrics using ISIMIP methodology.
     
@@ -314,11 +313,12 @@ def calculate_isimip_flood_risk(location: str = 'Malaysia (Country)',
         location: Malaysian state or country
         scenario: Climate scenario (for future: adjusts probabilities)
         years: Years of historical data
+        seed: Seed for the simulated historical data (None for random)
         
     Returns:
         DataFrame with flood risk metrics compatible with CLIMADA format
     """
-    processor = ISIMIPDataProcessor(location)
+    processor = ISIMIPDataProcessor(location, seed=seed)
     prob_analysis = processor.calculate_flood_probabilities(years)
     
     # Extract return levels
@@ -327,48 +327,91 @@ def calculate_isimip_flood_risk(location: str = 'Malaysia (Country)',
     
     # Convert to flood intensity (simplified model)
     # In practice, would use hydraulic modeling
-    results = []
+    return_periods = rainfall_rl['return_period'].to_numpy(dtype=float)
+    rainfall_levels = rainfall_rl['return_level'].to_numpy(dtype=float)
     
-    for idx, row in rainfall_rl.iterrows():
-        rp = row['return_period']
-        
-        # Find corresponding discharge
-        discharge_row = discharge_rl[discharge_rl['return_period'] == rp].iloc[0]
-        
-        # Estimate flood depth from rainfall and discharge
-        # Simplified empirical formula: depth = f(rainfall, discharge)
-        rainfall_component = row['return_level'] / 100  # Convert mm to rough depth
-        discharge_component = np.log10(discharge_row['return_level']) / 5
-        
-        flood_intensity = max(0.1, rainfall_component + discharge_component)
-        
-        # Adjust for climate scenario
-        scenario_factor = {
-            'historical': 1.0,
-            'rcp26': 1.1,
-            'rcp45': 1.25,
-            'rcp60': 1.35,
-            'rcp85': 1.5
-        }.get(scenario, 1.0)
-        
-        flood_intensity *= scenario_factor
-        
-        results.append({
-            'location': location,
-            'latitude': processor.coordinates['lat'],
-            'longitude': processor.coordinates['lon'],
-            'return_period': rp,
-            'flood_intensity_m': flood_intensity,
-            'annual_probability': row['annual_probability'],
-            'rainfall_return_level_mm': row['return_level'],
-            'discharge_return_level_m3s': discharge_row['return_level'],
-            'scenario': scenario,
-            'confidence_interval': f"[{row['ci_lower']:.1f}, {row['ci_upper']:.1f}]",
-            'data_source': 'ISIMIP historical analysis',
-            'data_years': years
-        })
+    # Find corresponding discharge for every return period
+    discharge_levels = (discharge_rl.set_index('return_period')['return_level']
+                        .reindex(rainfall_rl['return_period']).to_numpy(dtype=float))
+    
+    # Estimate flood depth from rainfall and discharge
+    # Simplified empirical formula: depth = f(rainfall, discharge)
+    rainfall_component = rainfall_levels / 100  # Convert mm to rough depth
+    discharge_component = np.log10(discharge_levels) / 5
+    
+    flood_intensity = np.maximum(0.1, rainfall_component + discharge_component)
+    
+    # Adjust for climate scenario
+    scenario_factor = {
+        'historical': 1.0,
+        'rcp26': 1.1,
+        'rcp45': 1.25,
+        'rcp60': 1.35,
+        'rcp85': 1.5
+    }.get(scenario, 1.0)
+    
+    flood_intensity *= scenario_factor
+    
+    confidence_interval = [
+        f"[{lower:.1f}, {upper:.1f}]"
+        for lower, upper in zip(rainfall_rl['ci_lower'].tolist(), rainfall_rl['ci_upper'].tolist())
+    ]
+    
+    return pd.DataFrame({
+        'location': location,
+        'latitude': processor.coordinates['lat'],
+        'longitude': processor.coordinates['lon'],
+        'return_period': return_periods,
+        'flood_intensity_m': flood_intensity,
+        'annual_probability': rainfall_rl['annual_probability'].to_numpy(dtype=float),
+        'rainfall_return_level_mm': rainfall_levels,
+        'discharge_return_level_m3s': discharge_levels,
+        'scenario': scenario,
+        'confidence_interval': confidence_interval,
+        'data_source': 'ISIMIP historical analysis',
+        'data_years': years
+    })
+
+
+def _isimip_flood_risk_worker(location: str, scenario: str, years: int) -> pd.DataFrame:
+    """Run calculate_isimip_flood_risk in a worker process with a per-location seed."""
+    # Seed from the location name so every location gets an independent,
+    # reproducible stream regardless of which worker runs it
+    seed = zlib.crc32(location.encode('utf-8'))
+    return calculate_isimip_flood_risk(location=location, scenario=scenario, years=years, seed=seed)
+
+
+def calculate_isimip_flood_risk_all(locations: Optional[List[str]] = None,
+                                    scenario: str = 'historical',
+                                    years: int = 50,
+                                    max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Calculate ISIMIP flood risk metrics for several locations in parallel.
+    
+    Each location is independent (simulation + GEV fit), so the work is
+    spread across processes.
+    
+    Args:
+        locations: Malaysian states or country (defaults to all supported regions)
+        scenario: Climate scenario
+        years: Years of historical data
+        max_workers: Number of worker processes (defaults to CPU count)
+        
+    Returns:
+        DataFrame with flood risk metrics for all locations, in input order
+    """
+    if locations is None:
+        locations = list(ISIMIPDataProcessor.MALAYSIA_REGIONS.keys())
+    
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(
+            _isimip_flood_risk_worker,
+            locations,
+            [scenario] * len(locations),
+            [years] * len(locations)
+        ))
     
-    return pd.DataFrame(results)
+    return pd.concat(results, ignore_index=True)
 
 
 def get_automatic_return_periods(location: str = 'Malaysia (Country)') -> List[int]:
@@ -2,21 +2,25 @@
 FastAPI Backend for Malaysia Climate Risk Assessment Platform
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Union
+import functools
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+from pyarrow import csv as pa_csv
 import json
-import io
+import secrets
 from datetime import datetime
 
-# Import our climate analysis modules
+# Import our climate analysis modules. The ISIMIP and CLIMADA modules pull in
+# scipy.stats (most of the API's import time), so they are imported on first
+# use by the endpoints that need them
 from climate_probability import ClimateEventAnalyzer, generate_sample_data
-from climate_probability_climada import ClimadaFloodAnalyzer, generate_climada_report
-from isimip_probability import ISIMIPDataProcessor
 
 app = FastAPI(
     title="Malaysia Climate Risk Assessment API",
@@ -61,8 +65,130 @@ class DataUploadResponse(BaseModel):
     rows: int
     columns: List[str]
 
-# Global storage for session data (in production, use proper session management)
-session_data = {}
+class SessionStore:
+    """
+    Session storage for uploaded and generated datasets.
+    
+    Each session maps dataset names ('rainfall', 'discharge') to DataFrames,
+    plus the 'analyzer' and 'summary' derived from its rainfall data.
+    Sessions hold live objects (the analyzer), so they stay in process memory
+    and all requests for a session must reach the same worker.
+    At most max_sessions are kept; the least recently used one is evicted.
+    """
+    
+    def __init__(self, max_sessions: int = 64):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    
+    def put(self, session_id: str, data: Dict[str, Any]) -> None:
+        self._sessions[session_id] = data
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+    
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get a session's datasets, or None if the session does not exist"""
+        data = self._sessions.get(session_id)
+        if data is not None:
+            self._sessions.move_to_end(session_id)
+        return data
+    
+    def delete(self, session_id: str) -> bool:
+        """Delete a session, returning whether it existed"""
+        return self._sessions.pop(session_id, None) is not None
+
+# Global session storage (in production, use proper session management)
+session_store = SessionStore()
+
+# Columns every uploaded CSV must provide
+REQUIRED_UPLOAD_COLUMNS = frozenset({'date', 'rainfall'})
+
+# Static reference data served by the API, built once at import
+MALAYSIA_LOCATIONS = [
+    "Malaysia (Country)", "Selangor", "Johor", "Kelantan", "Terengganu",
+    "Pahang", "Perak", "Penang", "Sabah", "Sarawak"
+]
+
+CLIMATE_SCENARIOS = [
+    {"id": "historical", "name": "Historical Baseline", "description": "Historical climate conditions based on past observations"},
+    {"id": "rcp26", "name": "RCP 2.6 (Strong Mitigation)", "description": "Best case scenario with aggressive climate action"},
+    {"id": "rcp45", "name": "RCP 4.5 (Moderate)", "description": "Moderate emissions scenario - most likely pathway"},
+    {"id": "rcp60", "name": "RCP 6.0 (Medium-High)", "description": "Limited emissions reductions"},
+    {"id": "rcp85", "name": "RCP 8.5 (High Emissions)", "description": "Business as usual, minimal climate action"}
+]
+
+SEASON_LABELS = {
+    'northeast_monsoon': 'Northeast Monsoon (Nov-Mar)',
+    'southwest_monsoon': 'Southwest Monsoon (May-Sep)',
+    'inter_monsoon': 'Inter-Monsoon (Apr, Oct)'
+}
+
+def format_dates(dates: Union[pd.Series, np.ndarray]) -> List[Optional[str]]:
+    """Format datetimes as YYYY-MM-DD strings (vectorized, no per-row strftime); missing dates become None"""
+    days = np.asarray(dates, dtype='datetime64[D]')
+    formatted = days.astype(str)
+    missing = np.isnat(days)
+    if missing.any():
+        formatted = formatted.astype(object)
+        formatted[missing] = None
+    return formatted.tolist()
+
+def format_values(values: Union[pd.Series, np.ndarray]) -> List[Optional[float]]:
+    """Plain floats for JSON; missing or non-finite values become None, since NaN/inf are not valid JSON"""
+    values = np.asarray(values, dtype=float)
+    missing = ~np.isfinite(values)
+    if missing.any():
+        values = values.astype(object)
+        values[missing] = None
+    return values.tolist()
+
+def downsample_indices(values: np.ndarray, max_points: Optional[int]) -> np.ndarray:
+    """
+    Positions of the largest value in each of max_points equal-width buckets.
+    
+    Keeps the peaks (the days that matter for flood risk) when a long series is
+    thinned out for plotting; returns every position if no reduction is needed.
+    """
+    n = len(values)
+    if max_points is None or n <= max_points:
+        return np.arange(n)
+    
+    starts = np.linspace(0, n, max_points, endpoint=False).astype(int)
+    bucket_ids = np.repeat(np.arange(max_points), np.diff(starts, append=n))
+    # Sort by bucket, then by descending value: each bucket's peak lands at its start
+    return np.lexsort((-values, bucket_ids))[starts]
+
+def dedupe_column_names(names: List[str]) -> List[str]:
+    """Rename repeated CSV headers the way pandas.read_csv does ('rainfall', 'rainfall.1', ...)"""
+    taken = set(names)
+    seen = set()
+    unique_names = []
+    for name in names:
+        candidate, count = name, 0
+        # Suffixes skip names that appear elsewhere in the header
+        while candidate in seen or (count > 0 and candidate in taken):
+            count += 1
+            candidate = f"{name}.{count}"
+        seen.add(candidate)
+        taken.add(candidate)
+        unique_names.append(candidate)
+    return unique_names
+
+def build_session(rainfall_data: pd.DataFrame, **datasets: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Session entry for a rainfall frame: the datasets, the analyzer built from
+    the rainfall data and its summary stats, all computed once when stored.
+    """
+    return {
+        'rainfall': rainfall_data,
+        **datasets,
+        'analyzer': ClimateEventAnalyzer(rainfall_data),
+        'summary': {
+            "total_days": len(rainfall_data),
+            "avg_rainfall": float(rainfall_data['rainfall'].mean()),
+            "max_rainfall": float(rainfall_data['rainfall'].max())
+        }
+    }
 
 @app.get("/")
 async def root():
@@ -72,61 +198,84 @@ async def root():
 async def get_locations():
     """Get available locations for analysis"""
     return {
-        "quick_analysis": [
-            "Malaysia (Country)", "Selangor", "Johor", "Kelantan", "Terengganu", 
-            "Pahang", "Perak", "Penang", "Sabah", "Sarawak"
-        ],
+        "quick_analysis": MALAYSIA_LOCATIONS,
         "regions": ["peninsular", "sabah", "sarawak"],
-        "climada_locations": [
-            "Malaysia (Country)", "Selangor", "Johor", "Kelantan", "Terengganu", 
-            "Pahang", "Perak", "Penang", "Sabah", "Sarawak"
-        ]
+        "climada_locations": MALAYSIA_LOCATIONS
     }
 
 @app.get("/api/scenarios")
 async def get_scenarios():
     """Get available climate scenarios"""
-    return {
-        "scenarios": [
-            {"id": "historical", "name": "Historical Baseline", "description": "Historical climate conditions based on past observations"},
-            {"id": "rcp26", "name": "RCP 2.6 (Strong Mitigation)", "description": "Best case scenario with aggressive climate action"},
-            {"id": "rcp45", "name": "RCP 4.5 (Moderate)", "description": "Moderate emissions scenario - most likely pathway"},
-            {"id": "rcp60", "name": "RCP 6.0 (Medium-High)", "description": "Limited emissions reductions"},
-            {"id": "rcp85", "name": "RCP 8.5 (High Emissions)", "description": "Business as usual, minimal climate action"}
-        ]
-    }
+    return {"scenarios": CLIMATE_SCENARIOS}
 
 @app.post("/api/upload-data")
 async def upload_data(file: UploadFile = File(...)):
     """Upload CSV data for analysis"""
     try:
-        contents = await file.read()
-        df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
+        # Parse straight from the spooled upload with Arrow's multithreaded reader
+        # (no decode into one big Python string). Rainfall keeps full float64
+        # precision; dates are left as text because Arrow would normalise
+        # offset-bearing timestamps to UTC
+        table = pa_csv.read_csv(
+            file.file,
+            convert_options=pa_csv.ConvertOptions(
+                column_types={'date': pa.string(), 'rainfall': pa.float64()}
+            )
+        )
+        
+        # Arrow keeps repeated header names, which would make df['rainfall'] a frame
+        if len(set(table.column_names)) != len(table.column_names):
+            table = table.rename_columns(dedupe_column_names(table.column_names))
         
         # Validate required columns
-        if 'date' not in df.columns or 'rainfall' not in df.columns:
+        if not REQUIRED_UPLOAD_COLUMNS.issubset(table.column_names):
             raise HTTPException(status_code=400, detail="CSV must contain 'date' and 'rainfall' columns")
         
-        # Convert date column
-        df['date'] = pd.to_datetime(df['date'])
+        df = table.to_pandas(date_as_object=False, split_blocks=True, self_destruct=True)
+        del table
+        
+        # Convert date column: ISO-8601 text takes pandas' fixed-format parser and
+        # anything else falls back to format inference. Timestamps with a UTC
+        # offset keep their local date
+        try:
+            dates = pd.to_datetime(df['date'], format='ISO8601')
+        except ValueError:
+            dates = pd.to_datetime(df['date'])
+        if isinstance(dates.dtype, pd.DatetimeTZDtype):
+            dates = dates.dt.tz_localize(None)
+        elif not pd.api.types.is_datetime64_any_dtype(dates):
+            raise ValueError("dates with a UTC offset must all use the same offset")
+        df['date'] = dates
+        
+        # The analyzer is built from the user's data here, so a failure to
+        # analyze it is reported as a bad upload rather than a server error
+        try:
+            session = build_session(df)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error analyzing uploaded data: {str(e)}") from e
         
         # Store in session (in production, use proper storage)
-        session_id = f"upload_{datetime.now().timestamp()}"
-        session_data[session_id] = df
+        session_id = f"upload_{secrets.token_hex(8)}"
+        session_store.put(session_id, session)
         
         return DataUploadResponse(
             message=f"Data uploaded successfully. Session ID: {session_id}",
             rows=len(df),
             columns=df.columns.tolist()
         )
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error processing file: {str(e)}")
+    except HTTPException:
+        raise
+    except (ValueError, OSError) as e:
+        # Unreadable CSV or unparseable values (pyarrow's ArrowInvalid is a ValueError)
+        raise HTTPException(status_code=400, detail=f"Error processing file: {str(e)}") from e
 
 @app.post("/api/generate-data")
 async def generate_data(request: AnalysisRequest):
     """Generate sample or ISIMIP data for analysis"""
     try:
         if request.data_source == "ISIMIP Historical Data":
+            from isimip_probability import ISIMIPDataProcessor
+            
             processor = ISIMIPDataProcessor(location=request.location)
             rainfall_df, discharge_df = processor.generate_historical_data(years=request.years)
             
@@ -135,11 +284,9 @@ async def generate_data(request: AnalysisRequest):
             data = data.rename(columns={'rainfall_mm': 'rainfall'})
             
             # Store both datasets
-            session_id = f"isimip_{datetime.now().timestamp()}"
-            session_data[session_id] = {
-                'rainfall': data,
-                'discharge': discharge_df
-            }
+            session_id = f"isimip_{secrets.token_hex(8)}"
+            session = build_session(data, discharge=discharge_df)
+            session_store.put(session_id, session)
             
             return {
                 "session_id": session_id,
@@ -148,50 +295,49 @@ async def generate_data(request: AnalysisRequest):
                 "discharge_records": len(discharge_df),
                 "years": request.years,
                 "data_summary": {
-                    "total_days": len(data),
-                    "date_range": f"{data['date'].min().year} - {data['date'].max().year}",
-                    "avg_rainfall": float(data['rainfall'].mean()),
-                    "max_rainfall": float(data['rainfall'].max())
+                    **session['summary'],
+                    "date_range": f"{data['date'].min().year} - {data['date'].max().year}"
                 }
             }
             
         elif request.data_source == "Generate Sample Data":
             data = generate_sample_data(years=request.years, location=request.region)
             
-            session_id = f"sample_{datetime.now().timestamp()}"
-            session_data[session_id] = {'rainfall': data}
+            session_id = f"sample_{secrets.token_hex(8)}"
+            session = build_session(data)
+            session_store.put(session_id, session)
             
             return {
                 "session_id": session_id,
                 "message": f"Generated {len(data)} days of sample rainfall data for {request.region.title()}",
                 "data_summary": {
-                    "total_days": len(data),
-                    "date_range": f"{data['date'].min().year} - {data['date'].max().year}",
-                    "avg_rainfall": float(data['rainfall'].mean()),
-                    "max_rainfall": float(data['rainfall'].max())
+                    **session['summary'],
+                    "date_range": f"{data['date'].min().year} - {data['date'].max().year}"
                 }
             }
         else:
             raise HTTPException(status_code=400, detail="Invalid data source")
             
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating data: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error generating data: {str(e)}") from e
 
 @app.post("/api/analyze-probabilities")
 async def analyze_probabilities(session_id: str, request: AnalysisRequest):
     """Calculate climate event probabilities"""
     try:
-        if session_id not in session_data:
+        data_dict = session_store.get(session_id)
+        if data_dict is None:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        data_dict = session_data[session_id]
-        rainfall_data = data_dict.get('rainfall') if isinstance(data_dict, dict) else data_dict
+        rainfall_data = data_dict.get('rainfall')
         
         if rainfall_data is None:
             raise HTTPException(status_code=400, detail="No rainfall data found in session")
         
-        # Create analyzer
-        analyzer = ClimateEventAnalyzer(rainfall_data)
+        # Analyzer built when the session was stored; its results are memoized
+        analyzer = data_dict['analyzer']
         
         # Calculate probabilities
         probabilities = analyzer.calculate_all_probabilities(request.time_window)
@@ -200,15 +346,10 @@ async def analyze_probabilities(session_id: str, request: AnalysisRequest):
         filtered_probs = {k: v for k, v in probabilities.items() if k in request.event_types}
         
         # Seasonal analysis
-        seasons = {
-            'northeast_monsoon': 'Northeast Monsoon (Nov-Mar)',
-            'southwest_monsoon': 'Southwest Monsoon (May-Sep)',
-            'inter_monsoon': 'Inter-Monsoon (Apr, Oct)'
-        }
-        
+        seasonal_probs = analyzer.get_seasonal_probabilities('flood')
         seasonal_data = []
-        for season_key, season_name in seasons.items():
-            prob = analyzer.get_seasonal_probability('flood', season_key)
+        for season_key, season_name in SEASON_LABELS.items():
+            prob = seasonal_probs[season_key]
             seasonal_data.append({
                 'season': season_name,
                 'flood_probability': prob,
@@ -219,150 +360,237 @@ async def analyze_probabilities(session_id: str, request: AnalysisRequest):
             "probabilities": filtered_probs,
             "seasonal_analysis": seasonal_data,
             "time_window": request.time_window,
-            "data_summary": {
-                "total_days": len(rainfall_data),
-                "avg_rainfall": float(rainfall_data['rainfall'].mean()),
-                "max_rainfall": float(rainfall_data['rainfall'].max())
-            }
+            "data_summary": data_dict['summary']
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error analyzing probabilities: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error analyzing probabilities: {str(e)}") from e
 
 @app.post("/api/predict-trend")
 async def predict_trend(session_id: str, request: TrendRequest):
     """Predict climate event trends"""
     try:
-        if session_id not in session_data:
+        data_dict = session_store.get(session_id)
+        if data_dict is None:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        data_dict = session_data[session_id]
-        rainfall_data = data_dict.get('rainfall') if isinstance(data_dict, dict) else data_dict
-        
-        if rainfall_data is None:
+        if data_dict.get('rainfall') is None:
             raise HTTPException(status_code=400, detail="No rainfall data found in session")
         
-        analyzer = ClimateEventAnalyzer(rainfall_data)
+        analyzer = data_dict['analyzer']
         trend = analyzer.predict_trend(request.event_type, years_ahead=request.years_ahead)
         
         return trend
         
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error predicting trend: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error predicting trend: {str(e)}") from e
 
 @app.get("/api/rainfall-timeseries/{session_id}")
-async def get_rainfall_timeseries(session_id: str):
-    """Get rainfall time series data for plotting"""
+async def get_rainfall_timeseries(session_id: str, max_points: Optional[int] = Query(None, ge=1)):
+    """Get rainfall time series data for plotting (optionally thinned to max_points peaks)"""
     try:
-        if session_id not in session_data:
+        data_dict = session_store.get(session_id)
+        if data_dict is None:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        data_dict = session_data[session_id]
-        rainfall_data = data_dict.get('rainfall') if isinstance(data_dict, dict) else data_dict
+        rainfall_data = data_dict.get('rainfall')
         
         if rainfall_data is None:
             raise HTTPException(status_code=400, detail="No rainfall data found in session")
         
-        # Convert to JSON-serializable format
+        if max_points is not None:
+            rainfall_data = rainfall_data.iloc[
+                downsample_indices(rainfall_data['rainfall'].to_numpy(), max_points)
+            ]
+        
+        # Convert to JSON-serializable format; the lists are already plain
+        # str/float, so return them directly instead of through FastAPI's encoder
         timeseries = {
-            'dates': rainfall_data['date'].dt.strftime('%Y-%m-%d').tolist(),
-            'rainfall': rainfall_data['rainfall'].tolist()
+            'dates': format_dates(rainfall_data['date']),
+            'rainfall': format_values(rainfall_data['rainfall'])
         }
         
-        return timeseries
+        return JSONResponse(content=timeseries)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting timeseries: {str(e)}") from e
+
+# Days per line of the streamed rainfall timeseries
+TIMESERIES_CHUNK_DAYS = 4096
+
+@app.get("/api/rainfall-timeseries/{session_id}/stream")
+async def stream_rainfall_timeseries(session_id: str):
+    """Stream rainfall time series as NDJSON lines of {"dates": [...], "rainfall": [...]}"""
+    try:
+        data_dict = session_store.get(session_id)
+        if data_dict is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        
+        rainfall_data = data_dict.get('rainfall')
+        
+        if rainfall_data is None:
+            raise HTTPException(status_code=400, detail="No rainfall data found in session")
+        
+        dates = rainfall_data['date'].to_numpy()
+        rainfall = rainfall_data['rainfall'].to_numpy()
+        
+        # Serialize one chunk at a time so the full payload is never held in memory
+        def ndjson_chunks():
+            for start in range(0, len(rainfall), TIMESERIES_CHUNK_DAYS):
+                stop = start + TIMESERIES_CHUNK_DAYS
+                chunk = {
+                    'dates': format_dates(dates[start:stop]),
+                    'rainfall': format_values(rainfall[start:stop])
+                }
+                yield json.dumps(chunk, allow_nan=False) + "\n"
+        
+        return StreamingResponse(ndjson_chunks(), media_type="application/x-ndjson")
         
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error getting timeseries: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error getting timeseries: {str(e)}") from e
 
 @app.get("/api/discharge-timeseries/{session_id}")
-async def get_discharge_timeseries(session_id: str):
-    """Get river discharge time series data for plotting"""
+async def get_discharge_timeseries(session_id: str, max_points: Optional[int] = Query(None, ge=1)):
+    """Get river discharge time series data for plotting (optionally thinned to max_points peaks)"""
     try:
-        if session_id not in session_data:
+        data_dict = session_store.get(session_id)
+        if data_dict is None:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        data_dict = session_data[session_id]
-        if not isinstance(data_dict, dict) or 'discharge' not in data_dict:
+        if 'discharge' not in data_dict:
             return {"message": "No discharge data available"}
         
         discharge_data = data_dict['discharge']
+        # One ndarray for the series and its stats, skipping pandas' per-call overhead
+        discharge = discharge_data['discharge_m3s'].to_numpy()
+        
+        # Stats cover the full series; only the plotted points are thinned
+        plotted = downsample_indices(discharge, max_points)
         
         # Convert to JSON-serializable format
         timeseries = {
-            'dates': discharge_data['date'].dt.strftime('%Y-%m-%d').tolist(),
-            'discharge': discharge_data['discharge_m3s'].tolist(),
+            'dates': format_dates(discharge_data['date'].iloc[plotted]),
+            'discharge': discharge[plotted].tolist(),
             'stats': {
-                'avg_discharge': float(discharge_data['discharge_m3s'].mean()),
-                'max_discharge': float(discharge_data['discharge_m3s'].max()),
-                'min_discharge': float(discharge_data['discharge_m3s'].min())
+                'avg_discharge': float(discharge.mean()),
+                'max_discharge': float(discharge.max()),
+                'min_discharge': float(discharge.min())
             }
         }
         
-        return timeseries
+        return JSONResponse(content=timeseries)
         
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error getting discharge timeseries: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error getting discharge timeseries: {str(e)}") from e
+
+@functools.lru_cache(maxsize=None)
+def climada_client():
+    """Process-wide CLIMADA API client, so its HTTP session and hazard cache are shared"""
+    from climate_probability_climada import ClimadaAPIClient
+    
+    return ClimadaAPIClient()
+
+# CLIMADA results only depend on their arguments, so they are computed once per
+# argument tuple and shared by later requests (callers must not mutate them)
+@functools.lru_cache(maxsize=256)
+def climada_analysis(location: str, scenario: str) -> Dict[str, Any]:
+    """Hazard records and expected annual impact for a location and scenario"""
+    from climate_probability_climada import ClimadaFloodAnalyzer
+    
+    analyzer = ClimadaFloodAnalyzer(api_client=climada_client())
+    analyzer.load_flood_hazard(scenario=scenario, location=location)
+    
+    return {
+        "hazard_data": analyzer.get_location_hazard(location).to_dict('records'),
+        "eai_results": analyzer.calculate_expected_annual_impact(location)
+    }
+
+@functools.lru_cache(maxsize=256)
+def climada_scenario_comparison(location: str, return_period: int) -> List[Dict[str, Any]]:
+    """Flood intensity per climate scenario for a location and return period"""
+    from climate_probability_climada import ClimadaFloodAnalyzer
+    
+    analyzer = ClimadaFloodAnalyzer(api_client=climada_client())
+    return analyzer.compare_scenarios(location, return_period).to_dict('records')
+
+@functools.lru_cache(maxsize=256)
+def climada_report(location: str, scenario: str) -> Dict[str, str]:
+    """Report text for a location and scenario, with the time it was generated"""
+    from climate_probability_climada import generate_climada_report
+    
+    return {
+        "report": generate_climada_report(location, scenario, api_client=climada_client()),
+        "generated_at": datetime.now().isoformat()
+    }
 
 # CLIMADA Analysis endpoints
 @app.post("/api/climada/analyze")
 async def climada_analyze(request: ClimadaRequest):
     """Perform CLIMADA flood analysis"""
     try:
-        analyzer = ClimadaFloodAnalyzer()
-        
-        # Get hazard data
-        hazard_data = analyzer.get_flood_hazard(request.location, request.scenario)
-        
-        # Calculate expected annual impact
-        eai_results = analyzer.calculate_expected_annual_impact(request.location)
+        analysis = climada_analysis(request.location, request.scenario)
         
         return {
             "location": request.location,
             "scenario": request.scenario,
-            "hazard_data": hazard_data,
-            "eai_results": eai_results
+            "hazard_data": analysis["hazard_data"],
+            "eai_results": analysis["eai_results"]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error in CLIMADA analysis: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error in CLIMADA analysis: {str(e)}") from e
 
 @app.post("/api/climada/compare-scenarios")
 async def climada_compare_scenarios(location: str, return_period: int = 100):
     """Compare flood intensity across climate scenarios"""
     try:
-        analyzer = ClimadaFloodAnalyzer()
-        comparison = analyzer.compare_scenarios(location, return_period)
+        comparison = climada_scenario_comparison(location, return_period)
         
         return {
             "location": location,
             "return_period": return_period,
-            "comparison": comparison.to_dict('records')
+            "comparison": comparison
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error comparing scenarios: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error comparing scenarios: {str(e)}") from e
 
 @app.post("/api/climada/generate-report")
 async def climada_generate_report(request: ClimadaRequest):
     """Generate comprehensive CLIMADA report"""
     try:
-        report = generate_climada_report(request.location, request.scenario)
+        report = climada_report(request.location, request.scenario)
         
         return {
             "location": request.location,
             "scenario": request.scenario,
-            "report": report,
-            "generated_at": datetime.now().isoformat()
+            "report": report["report"],
+            "generated_at": report["generated_at"]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}") from e
 
 @app.delete("/api/session/{session_id}")
 async def delete_session(session_id: str):
     """Delete session data"""
-    if session_id in session_data:
-        del session_data[session_id]
+    if session_store.delete(session_id):
         return {"message": "Session deleted successfully"}
     else:
         raise HTTPException(status_code=404, detail="Session not found")
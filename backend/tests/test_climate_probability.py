@@ -0,0 +1,44 @@
+"""Tests for ClimateEventAnalyzer."""
+
+import pandas as pd
+import pytest
+
+from climate_probability import ClimateEventAnalyzer, generate_sample_data
+
+
+@pytest.fixture
+def sample_data():
+    return generate_sample_data(years=6, seed=42)
+
+
+def test_missing_date_does_not_break_analyzer(sample_data):
+    gappy = sample_data.copy()
+    gappy.loc[gappy.index[1], 'date'] = pd.NaT
+    
+    analyzer = ClimateEventAnalyzer(gappy)
+    
+    # Every day still counts towards the event totals
+    assert analyzer.total_days == len(sample_data)
+    assert analyzer.event_counts == ClimateEventAnalyzer(sample_data).event_counts
+    
+    # Seasonal and trend results match the data with the undated day left out
+    dated = ClimateEventAnalyzer(gappy.dropna(subset=['date']).reset_index(drop=True))
+    assert analyzer.get_seasonal_probabilities('flood') == dated.get_seasonal_probabilities('flood')
+    trend = analyzer.predict_trend('flood', years_ahead=5)
+    expected = dated.predict_trend('flood', years_ahead=5)
+    assert trend['trend'] == expected['trend']
+    assert trend['slope'] == pytest.approx(expected['slope'])
+    assert trend['r_squared'] == pytest.approx(expected['r_squared'], nan_ok=True)
+
+
+def test_all_dates_missing(sample_data):
+    undated = sample_data.head(30).assign(date=pd.NaT)
+    
+    analyzer = ClimateEventAnalyzer(undated)
+    
+    assert analyzer.get_seasonal_probabilities('flood') == {
+        'northeast_monsoon': 0.0,
+        'southwest_monsoon': 0.0,
+        'inter_monsoon': 0.0,
+    }
+    assert analyzer.predict_trend('flood')['trend'] == 'insufficient_data'
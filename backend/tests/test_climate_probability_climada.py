@@ -0,0 +1,19 @@
+"""Tests for ClimadaFloodAnalyzer."""
+
+from climate_probability_climada import ClimadaAPIClient, ClimadaFloodAnalyzer
+
+
+def test_location_hazard_follows_reassigned_hazard_data():
+    client = ClimadaAPIClient(seed=0)
+    analyzer = ClimadaFloodAnalyzer(api_client=client, use_isimip=False)
+    analyzer.load_flood_hazard(scenario='historical')
+    historical = analyzer.get_location_hazard('Kelantan')
+    
+    analyzer.hazard_data = client.get_flood_hazard_malaysia(
+        scenario='rcp85', return_periods=[10, 25, 50, 100, 250]
+    )
+    
+    rcp85 = analyzer.get_location_hazard('Kelantan')
+    assert (rcp85['scenario'] == 'rcp85').all()
+    assert rcp85['return_period'].is_monotonic_increasing
+    assert len(rcp85) == len(historical)
@@ -0,0 +1,78 @@
+"""Tests for the FastAPI endpoints."""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+def upload(client, csv: bytes):
+    """Upload a CSV and return the response"""
+    return client.post('/api/upload-data', files={'file': ('data.csv', csv)})
+
+
+def session_id_of(response) -> str:
+    return response.json()['message'].split('Session ID: ')[1]
+
+
+def test_missing_dates_are_sent_as_null(client):
+    response = upload(client, b'date,rainfall\n2020-01-01,5\n,7\n2021-02-01,160\n')
+    assert response.status_code == 200
+    session_id = session_id_of(response)
+    
+    timeseries = client.get(f'/api/rainfall-timeseries/{session_id}').json()
+    assert timeseries['dates'] == ['2020-01-01', None, '2021-02-01']
+    assert timeseries['rainfall'] == [5.0, 7.0, 160.0]
+
+
+def test_missing_values_are_valid_json_on_both_timeseries_endpoints(client):
+    response = upload(client, b'date,rainfall\n2020-01-01,5\n,\n2020-01-03,inf\n')
+    assert response.status_code == 200
+    session_id = session_id_of(response)
+    
+    timeseries = client.get(f'/api/rainfall-timeseries/{session_id}')
+    assert timeseries.status_code == 200
+    assert timeseries.json() == {
+        'dates': ['2020-01-01', None, '2020-01-03'],
+        'rainfall': [5.0, None, None]
+    }
+    
+    stream = client.get(f'/api/rainfall-timeseries/{session_id}/stream')
+    assert stream.status_code == 200
+    assert 'NaN' not in stream.text
+    lines = [json.loads(line) for line in stream.text.splitlines()]
+    assert lines == [timeseries.json()]
+
+
+def test_repeated_headers_are_renamed_like_pandas(client):
+    response = upload(client, b'date,rainfall,rainfall\n2020-01-01,5,6\n2020-01-02,160,7\n')
+    assert response.status_code == 200
+    assert response.json()['columns'] == ['date', 'rainfall', 'rainfall.1']
+    
+    timeseries = client.get(f'/api/rainfall-timeseries/{session_id_of(response)}').json()
+    assert timeseries['rainfall'] == [5.0, 160.0]
+
+
+@pytest.mark.parametrize('csv, dates', [
+    (b'date,rainfall\n2020-01-01,5\n2020-01-02,6\n', ['2020-01-01', '2020-01-02']),
+    (b'date,rainfall\n2020-01-01T00:00:00+08:00,5\n2020-02-01T01:00:00+08:00,6\n', ['2020-01-01', '2020-02-01']),
+    (b'date,rainfall\n01/02/2020,5\n01/03/2020,6\n', ['2020-01-02', '2020-01-03']),
+])
+def test_upload_dates(client, csv, dates):
+    response = upload(client, csv)
+    assert response.status_code == 200
+    
+    timeseries = client.get(f'/api/rainfall-timeseries/{session_id_of(response)}').json()
+    assert timeseries['dates'] == dates
+
+
+def test_dates_with_mixed_offsets_are_rejected(client):
+    response = upload(client, b'date,rainfall\n2020-01-01T00:00:00+08:00,5\n2020-01-02T00:00:00+07:00,6\n')
+    assert response.status_code == 400